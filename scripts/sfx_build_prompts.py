@@ -0,0 +1,194 @@
+import argparse
+import re
+import sys
+import os
+
+from tts_build_input_all import extract_dialogues_from_line
+
+# --- Duration / timeline constants ---
+ONESHOT_DURATION = 5       # 効果音（ワンショット）の生成尺（秒）
+AMBIENCE_DURATION = 30     # 環境音（ループ素材）の生成尺（秒）
+CHARS_PER_SEC = 7.0        # セリフの読み上げ速度の目安（文字/秒）
+LINE_PAUSE_SEC = 1.0       # セリフ間の間（秒）
+
+# 音の長さや継続を指示するだけの括弧書き。プロンプトには含めず、環境音の判定に使う。
+CONTINUE_DIRECTIVES = ('背景で継続', '継続', 'ループ')
+FADE_OUT_DIRECTIVES = ('フェードアウト',)
+
+SFX_LINE_RE = re.compile(r'^SFX:\s*(?:「([^」]*)」)?\s*(.*)$')
+PAREN_RE = re.compile(r'（([^）]*)）')
+
+
+def parse_sfx_line(line):
+    """
+    Parses a `SFX: 「擬音」説明（指示）` line.
+    - Returns a dict with onomatopoeia, description (directives removed) and
+      the directive flags, or None if the line is not an SFX cue.
+    """
+    line = line.strip()
+    match = SFX_LINE_RE.match(line)
+    if not match:
+        return None
+
+    onomatopoeia = (match.group(1) or '').strip(' 　')
+    rest = match.group(2).strip()
+
+    directives = PAREN_RE.findall(rest)
+    continues = any(d in CONTINUE_DIRECTIVES for d in directives)
+    fades_out = any(d in FADE_OUT_DIRECTIVES for d in directives)
+
+    # Keep descriptive parentheticals such as "（ゆっくり）", drop the mixing directives
+    description = PAREN_RE.sub(
+        lambda m: '' if m.group(1) in CONTINUE_DIRECTIVES + FADE_OUT_DIRECTIVES else m.group(0),
+        rest,
+    ).strip(' 　')
+
+    if not onomatopoeia and not description:
+        return None
+
+    return {
+        'onomatopoeia': onomatopoeia,
+        'description': description,
+        'continues': continues,
+        'fades_out': fades_out,
+    }
+
+
+def cue_key(cue):
+    """
+    Returns the deduplication key of a cue.
+    The same onomatopoeia means the same sound (e.g. 「ザーザー」雨が窓を打つ音 /
+    「ザーザー」雨音), otherwise the description itself is used.
+    """
+    if cue['onomatopoeia']:
+        return re.sub(r'[\s　…・.。、]', '', cue['onomatopoeia'])
+    return re.sub(r'\s+', '', cue['description'])
+
+
+def build_prompt(cue, is_ambience):
+    """Builds a prompt line in the same style as a hand-written sfx_prompts.txt."""
+    parts = [p for p in (cue['description'], cue['onomatopoeia']) if p]
+    if is_ambience:
+        parts.append('ループ向け')
+    return '、'.join(parts)
+
+
+def extract_sfx_cues(lines):
+    """
+    Extracts, deduplicates and ranks SFX cues from script lines.
+    - Repeated cues (same onomatopoeia) are merged into one generation.
+    - Cues marked as continuing (or ended by a fade-out) are treated as ambience.
+    - Coverage time is estimated from the dialogue length between cues.
+    - Returns the cues sorted by coverage time, occurrences, then first appearance.
+    """
+    cues = {}
+    elapsed = 0.0
+
+    for i, line in enumerate(lines):
+        line_num = i + 1
+        parsed = parse_sfx_line(line)
+
+        if parsed is None:
+            dialogues, _ = extract_dialogues_from_line(line)
+            for dialogue in dialogues:
+                elapsed += len(dialogue.strip(' 　')) / CHARS_PER_SEC + LINE_PAUSE_SEC
+            continue
+
+        key = cue_key(parsed)
+        cue = cues.get(key)
+        if cue is None:
+            cue = {
+                'key': key,
+                'onomatopoeia': parsed['onomatopoeia'],
+                'description': parsed['description'],
+                'first_line': line_num,
+                'occurrences': 0,
+                'is_ambience': False,
+                'start_sec': elapsed,
+                'end_sec': None,
+            }
+            cues[key] = cue
+
+        cue['occurrences'] += 1
+        if parsed['continues'] or parsed['fades_out']:
+            cue['is_ambience'] = True
+        if parsed['fades_out']:
+            cue['end_sec'] = elapsed
+
+    script_end = elapsed
+    ranked = []
+    for cue in cues.values():
+        if cue['is_ambience']:
+            duration = AMBIENCE_DURATION
+            end_sec = cue['end_sec'] if cue['end_sec'] is not None else script_end
+            coverage = max(end_sec - cue['start_sec'], duration)
+        else:
+            duration = ONESHOT_DURATION
+            coverage = duration * cue['occurrences']
+
+        ranked.append({
+            'key': cue['key'],
+            'prompt': build_prompt(cue, cue['is_ambience']),
+            'duration': duration,
+            'is_ambience': cue['is_ambience'],
+            'occurrences': cue['occurrences'],
+            'coverage_sec': round(float(coverage), 1),
+            'first_line': cue['first_line'],
+        })
+
+    ranked.sort(key=lambda c: (-c['coverage_sec'], -c['occurrences'], c['first_line']))
+    return ranked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a prioritized SFX prompt list from a script file.')
+    parser.add_argument('--issue-id', required=True, help='The issue ID.')
+    parser.add_argument('--dry-run', action='store_true', help='Print to stdout instead of writing to a file.')
+    args = parser.parse_args()
+
+    issue_id = args.issue_id
+    dry_run = args.dry_run
+
+    input_path = f'assets/issues/{issue_id}/text/script.md'
+    output_path = f'assets/issues/{issue_id}/sfx_prompts.txt'
+
+    try:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        print(f"Error: Input file not found at {input_path}", file=sys.stderr)
+        sys.exit(1)
+
+    cues = extract_sfx_cues(lines)
+    if not cues:
+        print("Error: No SFX cues were extracted.", file=sys.stderr)
+        sys.exit(2)
+
+    total_occurrences = sum(cue['occurrences'] for cue in cues)
+    output_content = "\n".join(cue['prompt'] for cue in cues) + '\n'
+
+    if dry_run:
+        print("--- Dry Run Output ---")
+        for rank, cue in enumerate(cues, start=1):
+            kind = 'ambience' if cue['is_ambience'] else 'one-shot'
+            print(
+                f"{rank:2d}. [{kind}, {cue['duration']}s, x{cue['occurrences']}, "
+                f"coverage {cue['coverage_sec']}s] {cue['prompt']}"
+            )
+        print("--- End Dry Run ---")
+    else:
+        output_dir = os.path.dirname(output_path)
+        os.makedirs(output_dir, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output_content)
+        print(f"Successfully wrote {len(cues)} SFX prompts to {output_path}")
+
+    print(
+        f"{total_occurrences} SFX cues in script, {len(cues)} unique "
+        f"({total_occurrences - len(cues)} duplicates merged)."
+    )
+
+    sys.exit(0)
+
+if __name__ == '__main__':
+    main()
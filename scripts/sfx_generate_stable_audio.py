@@ -11,6 +11,8 @@ from pathlib import Path
 
 import requests
 
+from sfx_build_prompts import extract_sfx_cues
+
 # --- Setup Logging ---
 logging.basicConfig(
     level=logging.INFO,
@@ -155,11 +157,16 @@ def main():
 
     parser = argparse.ArgumentParser(description="Generate SFX using Stable Audio API.")
     parser.add_argument("--issue-id", type=str, help="Issue ID for metadata.")
-    parser.add_argument(
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument(
         "--prompts-file",
         type=str,
         help="Path to a text file with one prompt per line.",
-        required=True
+    )
+    source_group.add_argument(
+        "--script-file",
+        type=str,
+        help="Path to script.md. SFX cues are extracted, deduplicated and ranked by priority.",
     )
     parser.add_argument(
         "--outdir",
@@ -170,8 +177,10 @@ def main():
     parser.add_argument(
         "--duration",
         type=int,
-        default=DEFAULT_DURATION,
-        help="Duration of the audio in seconds.",
+        help=(
+            "Duration of the audio in seconds. Overrides the per-cue duration "
+            f"chosen from --script-file (default: {DEFAULT_DURATION} for --prompts-file)."
+        ),
     )
     parser.add_argument("--seed", type=int, help="Seed for reproducibility.")
     parser.add_argument(
@@ -198,9 +207,9 @@ def main():
     outdir = Path(args.outdir)
     outdir.mkdir(exist_ok=True)
 
-    prompts_file = Path(args.prompts_file)
-    if not prompts_file.is_file():
-        logging.error(f"Prompts file not found at: {prompts_file}")
+    source_file = Path(args.script_file or args.prompts_file)
+    if not source_file.is_file():
+        logging.error(f"Input file not found at: {source_file}")
         sys.exit(1)
 
     index_file = outdir / "sfx_index.jsonl"
@@ -208,18 +217,34 @@ def main():
     generator = SfxGenerator(api_key=api_key, base_url=BASE_URL)
 
     # --- Process Prompts ---
-    with open(prompts_file, "r", encoding="utf-8") as f:
-        all_prompts = [line.strip() for line in f if line.strip()]
-
-    sfx_total_in_script = len(all_prompts)
+    with open(source_file, "r", encoding="utf-8") as f:
+        if args.script_file:
+            # Cues are already deduplicated and sorted by priority
+            all_cues = extract_sfx_cues(f.readlines())
+            sfx_duplicates_merged = sum(c["occurrences"] for c in all_cues) - len(all_cues)
+        else:
+            all_cues = [
+                {"prompt": line.strip(), "duration": DEFAULT_DURATION}
+                for line in f if line.strip()
+            ]
+            sfx_duplicates_merged = 0
+
+    if args.duration is not None:
+        for cue in all_cues:
+            cue["duration"] = args.duration
+
+    sfx_total_in_script = len(all_cues)
     sfx_limit = args.max_sfx
-    prompts_to_process = all_prompts[:sfx_limit]
+    prompts_to_process = all_cues[:sfx_limit]
     sfx_generated_count = len(prompts_to_process)
     sfx_skipped_count = sfx_total_in_script - sfx_generated_count
 
+    if sfx_duplicates_merged:
+        logging.info(f"重複する SFX 指示 {sfx_duplicates_merged} 件を統合しました。")
+
     if sfx_total_in_script > sfx_limit:
         logging.warning(
-            f"prompts-file には {sfx_total_in_script} 件ありますが、上限 {sfx_limit} 件のみ生成します"
+            f"{source_file.name} には {sfx_total_in_script} 件ありますが、上限 {sfx_limit} 件のみ生成します"
             f"（残り {sfx_skipped_count} 件はスキップ）。"
         )
 
@@ -228,11 +253,12 @@ def main():
         sys.exit(1)
 
     generated_metadata = []
-    for prompt in prompts_to_process:
+    for cue in prompts_to_process:
+        prompt = cue["prompt"]
         try:
             audio_data, final_seed = generator.generate(
                 prompt_text=prompt,
-                duration_sec=args.duration,
+                duration_sec=cue["duration"],
                 seed=args.seed,
                 lang=args.lang,
             )
@@ -248,10 +274,12 @@ def main():
             metadata = {
                 "file": filename,
                 "prompt": prompt,
-                "duration": args.duration,
+                "duration": cue["duration"],
                 "seed": final_seed,
                 "sr": DEFAULT_SR,
                 "issue_id": args.issue_id,
+                "occurrences": cue.get("occurrences", 1),
+                "coverage_sec": cue.get("coverage_sec"),
                 "created_at": datetime.utcnow().isoformat() + "Z",
             }
             generated_metadata.append(metadata)
@@ -264,9 +292,11 @@ def main():
     if generated_metadata:
         run_summary = {
             "type": "run_summary",
-            "prompts_file": str(prompts_file),
+            "prompts_file": args.prompts_file,
+            "script_file": args.script_file,
             "sfx_limit": sfx_limit,
             "sfx_total_in_script": sfx_total_in_script,
+            "sfx_duplicates_merged": sfx_duplicates_merged,
             "sfx_generated": len(generated_metadata),
             "sfx_skipped": sfx_total_in_script - len(generated_metadata),
             "created_at": datetime.utcnow().isoformat() + "Z",